@@ -142,3 +142,10 @@ LOGOUT_REDIRECT_URL = 'home'
 
 # n8n webhook configuration (set this in local settings or env in production)
 N8N_WEBHOOK_URL = 'https://jjohnson183.app.n8n.cloud/webhook/upload-image'
+
+# Per-user caching of rendered case fragments (see receipts/cache.py).
+# Point RECEIPTS_CACHE_ALIAS at any entry in CACHES to change the backend, and set
+# RECEIPTS_CACHE_STATS_HOOK to a dotted path to receive hit/miss reports.
+RECEIPTS_CACHE_ALIAS = 'default'
+RECEIPTS_CACHE_TIMEOUT = 300
+RECEIPTS_CACHE_STATS_HOOK = None
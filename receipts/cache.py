@@ -0,0 +1,97 @@
+"""Per-user caching of rendered case fragments.
+
+Fragments are stored in the cache named by `RECEIPTS_CACHE_ALIAS` in settings
+(defaults to Django's 'default' cache), so any configured backend works.
+
+Keys embed the same version data the views put in their ETags (case count and
+latest `updated_at` for the list, `updated_at` for a detail page), so any change
+to a user's cases -- whichever code path makes it, in whichever process -- moves
+to a new key instead of relying on explicit invalidation.
+
+If `RECEIPTS_CACHE_STATS_HOOK` is set to a dotted path, that callable is called
+after every lookup as hook(fragment, hit, stats) where `stats` is the running
+FragmentStats for that fragment name. The counters live in process memory, so
+each worker keeps its own, and increments are not locked -- treat them as
+approximate under threaded servers.
+"""
+import functools
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+
+logger = logging.getLogger(__name__)
+
+
+class FragmentStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+# In-process counters keyed by fragment name ('case_list', 'case_detail')
+stats = {}
+
+
+def get_cache():
+    return caches[getattr(settings, 'RECEIPTS_CACHE_ALIAS', 'default')]
+
+
+def _stamp(dt):
+    return dt.timestamp() if dt else 0
+
+
+def list_fragment_key(user_id, count, last_updated):
+    return f"receipts:user:{user_id}:case_list:{count}:{_stamp(last_updated)}"
+
+
+def detail_fragment_key(user_id, case_id, updated_at):
+    return f"receipts:user:{user_id}:case:{case_id}:{_stamp(updated_at)}"
+
+
+@functools.lru_cache(maxsize=None)
+def _load_hook(hook_path):
+    try:
+        return import_string(hook_path)
+    except ImportError:
+        logger.exception("Could not import RECEIPTS_CACHE_STATS_HOOK %r", hook_path)
+        return None
+
+
+def _report(fragment, hit):
+    fragment_stats = stats.setdefault(fragment, FragmentStats())
+    if hit:
+        fragment_stats.hits += 1
+    else:
+        fragment_stats.misses += 1
+
+    hook_path = getattr(settings, 'RECEIPTS_CACHE_STATS_HOOK', None)
+    hook = _load_hook(hook_path) if hook_path else None
+    if hook is None:
+        return
+    try:
+        hook(fragment, hit, fragment_stats)
+    except Exception:
+        # Reporting must never break the page being served
+        logger.exception("RECEIPTS_CACHE_STATS_HOOK raised for fragment %r", fragment)
+
+
+def get_or_render(fragment, key, render):
+    """Return the cached HTML for `key`, calling `render()` and storing the result on a miss."""
+    cache = get_cache()
+    html = cache.get(key)
+    if html is not None:
+        _report(fragment, True)
+        return mark_safe(html)
+
+    html = render()
+    cache.set(key, str(html), getattr(settings, 'RECEIPTS_CACHE_TIMEOUT', 300))
+    _report(fragment, False)
+    return mark_safe(html)
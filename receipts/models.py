@@ -6,6 +6,7 @@ class Case(models.Model):
     receipt_image = models.ImageField(upload_to='receipts/')
     csv_file = models.FileField(upload_to='cases_csv/', blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     processed = models.BooleanField(default=False)
 
     def __str__(self):
@@ -1,3 +1,197 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from . import cache as fragment_cache
+from .models import Case
+
+hook_calls = []
+
+
+def record_stats(fragment, hit, stats):
+    hook_calls.append((fragment, hit, stats.hits, stats.misses))
+
+
+def failing_hook(fragment, hit, stats):
+    raise RuntimeError("stats backend down")
+
+
+def png_upload(name='receipt.png'):
+    buf = BytesIO()
+    Image.new('RGB', (1, 1)).save(buf, format='PNG')
+    return SimpleUploadedFile(name, buf.getvalue(), content_type='image/png')
+
+
+class FakeN8nResponse:
+    status_code = 200
+    text = "merchant,total\nWalmart,9.99\n"
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    RECEIPTS_CACHE_STATS_HOOK=None,
+)
+class CaseCachingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        cls.enterClassContext(override_settings(MEDIA_ROOT=media_root))
+        super().setUpClass()
+
+    def setUp(self):
+        caches['default'].clear()
+        fragment_cache.stats.clear()
+        hook_calls.clear()
+        self.user = User.objects.create_user('alice', password='pw')
+        self.other = User.objects.create_user('bob', password='pw')
+        self.case = Case.objects.create(user=self.user, receipt_image=png_upload())
+        self.client.force_login(self.user)
+
+    def etag_for(self, url):
+        # The first render sets the CSRF cookie, which is part of the HTML ETag
+        self.client.get(url)
+        return self.client.get(url)['ETag']
+
+    def counts(self, fragment):
+        stats = fragment_cache.stats.get(fragment)
+        return (stats.hits, stats.misses) if stats else (0, 0)
+
+    def test_case_list_returns_304_for_matching_etag(self):
+        url = reverse('case_list')
+        etag = self.etag_for(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_case_detail_returns_304_for_matching_etag(self):
+        url = reverse('case_detail', args=[self.case.pk])
+        etag = self.etag_for(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_csv_download_returns_304_for_matching_etag(self):
+        self.case.csv_file.save('case.csv', ContentFile("a,b\n1,2\n"))
+        url = reverse('case_download_csv', args=[self.case.pk])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_pending_messages_bypass_conditional_get(self):
+        detail_url = reverse('case_detail', args=[self.case.pk])
+        etag = self.etag_for(detail_url)
+        with mock.patch('receipts.views.send_file_to_n8n', return_value=FakeN8nResponse()):
+            self.client.get(reverse('case_download_csv', args=[self.case.pk]))
+
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_other_users_case_is_404_without_etag(self):
+        theirs = Case.objects.create(user=self.other, receipt_image=png_upload())
+        theirs.csv_file.save('theirs.csv', ContentFile("a\n1\n"))
+        for name in ('case_detail', 'case_download_csv'):
+            response = self.client.get(reverse(name, args=[theirs.pk]))
+            self.assertEqual(response.status_code, 404)
+            self.assertFalse(response.has_header('ETag'))
+            self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_html_pages_have_no_last_modified(self):
+        for url in (reverse('case_list'), reverse('case_detail', args=[self.case.pk])):
+            self.assertFalse(self.client.get(url).has_header('Last-Modified'))
+
+    def test_conditional_responses_force_revalidation(self):
+        self.case.csv_file.save('case.csv', ContentFile("a,b\n1,2\n"))
+        for name, args in (('case_list', []), ('case_detail', [self.case.pk]), ('case_download_csv', [self.case.pk])):
+            response = self.client.get(reverse(name, args=args))
+            self.assertEqual(response.status_code, 200)
+            directives = {d.strip() for d in response['Cache-Control'].split(',')}
+            self.assertTrue({'private', 'no-cache'} <= directives, (name, response['Cache-Control']))
+
+    def test_case_added_outside_views_refreshes_list(self):
+        url = reverse('case_list')
+        etag = self.etag_for(url)
+        added = Case.objects.create(user=self.user, receipt_image=png_upload())
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(response, f"Case {added.pk} ")
+
+    def prime_fragments(self):
+        """Render and cache alice's list and both detail pages plus bob's list."""
+        self.second = Case.objects.create(user=self.user, receipt_image=png_upload())
+        Case.objects.create(user=self.other, receipt_image=png_upload())
+        self.client.get(reverse('case_list'))
+        self.client.get(reverse('case_detail', args=[self.case.pk]))
+        self.client.get(reverse('case_detail', args=[self.second.pk]))
+        self.client.force_login(self.other)
+        self.client.get(reverse('case_list'))
+        self.client.force_login(self.user)
+        fragment_cache.stats.clear()
+
+    def assert_only_owner_fragments_refreshed(self):
+        self.client.get(reverse('case_list'))
+        self.client.get(reverse('case_detail', args=[self.case.pk]))
+        self.assertEqual(self.counts('case_list'), (0, 1))
+        self.assertEqual(self.counts('case_detail'), (0, 1))
+
+        self.client.get(reverse('case_detail', args=[self.second.pk]))
+        self.client.force_login(self.other)
+        self.client.get(reverse('case_list'))
+        self.assertEqual(self.counts('case_list'), (1, 1))
+        self.assertEqual(self.counts('case_detail'), (1, 1))
+
+    def test_n8n_callback_refreshes_only_owner_fragments(self):
+        self.prime_fragments()
+        self.client.post(reverse('n8n_callback'), {'case_id': self.case.pk, 'csv': "a,b\n1,2\n"})
+        self.assertTrue(Case.objects.get(pk=self.case.pk).processed)
+        self.assert_only_owner_fragments_refreshed()
+
+    def test_upload_refreshes_owner_list(self):
+        self.prime_fragments()
+        with mock.patch('receipts.views.send_file_to_n8n', return_value=FakeN8nResponse()):
+            self.client.post(reverse('home_signedin'), {'receipt_image': png_upload()})
+        uploaded = Case.objects.filter(user=self.user).latest('created_at')
+        self.assertTrue(uploaded.processed)
+
+        response = self.client.get(reverse('case_list'))
+        self.assertContains(response, f"Case {uploaded.pk} ")
+        self.assertEqual(self.counts('case_list'), (0, 1))
+
+        self.client.get(reverse('case_detail', args=[self.case.pk]))
+        self.client.force_login(self.other)
+        self.client.get(reverse('case_list'))
+        self.assertEqual(self.counts('case_list'), (1, 1))
+        self.assertEqual(self.counts('case_detail'), (1, 0))
+
+    @override_settings(RECEIPTS_CACHE_STATS_HOOK='receipts.tests.record_stats')
+    def test_stats_hook_reports_hits_and_misses(self):
+        url = reverse('case_list')
+        self.client.get(url)
+        self.client.get(url)
+        self.client.get(url)
+        self.assertEqual(hook_calls, [
+            ('case_list', False, 0, 1),
+            ('case_list', True, 1, 1),
+            ('case_list', True, 2, 1),
+        ])
+        self.assertAlmostEqual(fragment_cache.stats['case_list'].hit_ratio, 2 / 3)
+
+    @override_settings(RECEIPTS_CACHE_STATS_HOOK='receipts.tests.failing_hook')
+    def test_failing_stats_hook_does_not_break_page(self):
+        with self.assertLogs('receipts.cache', level='ERROR'):
+            response = self.client.get(reverse('case_list'))
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(RECEIPTS_CACHE_STATS_HOOK='receipts.tests.no_such_hook')
+    def test_unimportable_stats_hook_does_not_break_page(self):
+        with self.assertLogs('receipts.cache', level='ERROR'):
+            response = self.client.get(reverse('case_list'))
+        self.assertEqual(response.status_code, 200)
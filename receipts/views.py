@@ -17,13 +17,19 @@ except Exception:
     requests = None
 from django.conf import settings
 from django.http import JsonResponse
-from django.http import HttpResponse, FileResponse
+from django.http import HttpResponse, FileResponse, Http404
 import os
 import json
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.views import View
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.db.models import Count, Max
+from django.template.loader import render_to_string
+import hashlib
 import re
+from . import cache as fragment_cache
 
 
 def send_file_to_n8n(file_field, webhook_path=None):
@@ -64,6 +70,59 @@ def send_file_to_n8n(file_field, webhook_path=None):
 
     return resp
 
+
+def _csrf_fingerprint(request):
+    # Pages embed the CSRF token (logout form), so a rotated token must change the ETag
+    return hashlib.sha1(request.META.get('CSRF_COOKIE', '').encode()).hexdigest()[:8]
+
+
+def _has_pending_messages(request):
+    # A 304 would swallow flash messages, so skip conditional handling while any are queued
+    return len(messages.get_messages(request)) > 0
+
+
+def _case_list_state(request):
+    state = getattr(request, '_case_list_state', None)
+    if state is None:
+        state = request.user.cases.aggregate(count=Count('id'), last=Max('updated_at'))
+        request._case_list_state = state
+    return state
+
+
+def _case_list_etag(request, *args, **kwargs):
+    if _has_pending_messages(request):
+        return None
+    state = _case_list_state(request)
+    last = state['last'].timestamp() if state['last'] else 0
+    return f"cases-{request.user.pk}-{state['count']}-{last}-{_csrf_fingerprint(request)}"
+
+
+def _owned_case(request, pk):
+    if not hasattr(request, '_owned_case'):
+        request._owned_case = request.user.cases.filter(pk=pk).first()  # only the owner may see a case
+    return request._owned_case
+
+
+def _case_detail_etag(request, pk):
+    case = _owned_case(request, pk)
+    if case is None or _has_pending_messages(request):
+        return None
+    return f"case-{case.pk}-{case.updated_at.timestamp()}-{_csrf_fingerprint(request)}"
+
+
+def _case_csv_etag(request, pk):
+    case = _owned_case(request, pk)
+    if case is None or not case.csv_file:
+        return None
+    return f"csv-{case.pk}-{case.updated_at.timestamp()}"
+
+
+def _case_csv_last_modified(request, pk):
+    case = _owned_case(request, pk)
+    if case is None or not case.csv_file:
+        return None
+    return case.updated_at
+
 # Landing / Home page
 class LandingPageView(TemplateView):
     template_name = "landing/index.html"
@@ -128,9 +187,14 @@ class SendReceiptToN8nView(LoginRequiredMixin, View):
 
 
 class DownloadCSVView(LoginRequiredMixin, View):
-    """Return a CSV for a Case. If the CSV is not yet present, request processing from n8n and save the result."""
+    """Return a CSV for a Case. If the CSV is not yet present, request processing from n8n and save the result.
+
+    Saved CSVs carry ETag/Last-Modified headers so unchanged downloads return 304.
+    """
+    @method_decorator(cache_control(private=True, no_cache=True))
+    @method_decorator(condition(etag_func=_case_csv_etag, last_modified_func=_case_csv_last_modified))
     def get(self, request, pk):
-        case = Case.objects.filter(pk=pk, user=request.user).first()
+        case = _owned_case(request, pk)
         if not case:
             return JsonResponse({'error': 'Case not found'}, status=404)
 
@@ -331,14 +395,52 @@ class CaseListView(LoginRequiredMixin, ListView):
     template_name = "cases/case_list.html"
     context_object_name = "cases"
 
+    # No Last-Modified here: Max(updated_at) goes backwards when the newest case is
+    # deleted, so only the ETag (which includes the case count) is reliable.
+    # no-cache makes browsers revalidate instead of applying heuristic freshness.
+    @method_decorator(cache_control(private=True, no_cache=True))
+    @method_decorator(condition(etag_func=_case_list_etag))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
         return self.request.user.cases.all().order_by('-created_at')
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        state = _case_list_state(self.request)
+        # The queryset is lazy, so a cache hit skips the case query entirely
+        context['case_list_html'] = fragment_cache.get_or_render(
+            'case_list',
+            fragment_cache.list_fragment_key(self.request.user.pk, state['count'], state['last']),
+            lambda: render_to_string("cases/_case_list_items.html", {'cases': self.object_list}, request=self.request),
+        )
+        return context
+
 
 class CaseDetailView(LoginRequiredMixin, DetailView):
     model = Case
     template_name = "cases/case_detail.html"
     context_object_name = "case"
 
-    def get_queryset(self):
-        return self.request.user.cases.all()  # only allow owner to see their cases
+    # ETag only: Last-Modified can't see a rotated CSRF token, so If-Modified-Since
+    # alone would 304 a page whose logout form carries a stale token.
+    @method_decorator(cache_control(private=True, no_cache=True))
+    @method_decorator(condition(etag_func=_case_detail_etag))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_object(self, queryset=None):
+        case = _owned_case(self.request, self.kwargs['pk'])
+        if case is None:
+            raise Http404("Case not found")
+        return case
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['case_detail_html'] = fragment_cache.get_or_render(
+            'case_detail',
+            fragment_cache.detail_fragment_key(self.request.user.pk, self.object.pk, self.object.updated_at),
+            lambda: render_to_string("cases/_case_detail_body.html", {'case': self.object}, request=self.request),
+        )
+        return context